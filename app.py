@@ -1,4 +1,4 @@
-from flask import Flask
+from flask import Flask, Response
 import sentry_sdk
 from sentry_sdk.integrations.flask import FlaskIntegration
 import os
@@ -6,22 +6,45 @@ import os
 # Put your real DSN here (or use env var for extra safety)
 import sentry_sdk
 
-sentry_sdk.init(
-    dsn="https://7e57dd91c16a6461fb36e95a2f7500e1@o4510366813519872.ingest.us.sentry.io/4510370710224896",
-    # Add data like request headers and IP for users,
-    # see https://docs.sentry.io/platforms/python/data-management/data-collected/ for more info
-    send_default_pii=True,
-)
+# On by default; set SENTRY_ENABLED=0 (or false/no/off) to skip the SDK and its per-request instrumentation
+if os.environ.get("SENTRY_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off"):
+    sentry_sdk.init(
+        dsn="https://7e57dd91c16a6461fb36e95a2f7500e1@o4510366813519872.ingest.us.sentry.io/4510370710224896",
+        # Add data like request headers and IP for users,
+        # see https://docs.sentry.io/platforms/python/data-management/data-collected/ for more info
+        send_default_pii=True,
+        integrations=[FlaskIntegration(transaction_style="url")],
+        # Errors only; no performance tracing on every request
+        traces_sample_rate=0.0,
+    )
 app = Flask(__name__)
 
+# Encoded once at import so "/" doesn't re-encode the same string on every request
+_HOME_RESPONSE_BODY = "Sentry is working! Go to /bug to trigger an error 🪲".encode("utf-8")
+_HOME_RESPONSE_HEADERS = {"Cache-Control": "public, max-age=60"}
+
+def _static_response():
+    # A fresh Response per request: after_request hooks and session saving mutate it
+    r = Response(
+        _HOME_RESPONSE_BODY,
+        headers=_HOME_RESPONSE_HEADERS,
+        content_type="text/html; charset=utf-8",
+    )
+    r.direct_passthrough = True
+    return r
+
 @app.route("/")
 def home():
-    return "Sentry is working! Go to /bug to trigger an error 🪲"
+    return _static_response()
 
 @app.route("/bug")
 def trigger_bug():
-    1 / 0  # deliberate division by zero
+    raise ZeroDivisionError("division by zero")  # deliberate error for Sentry to capture
     return "no bug :("
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000)
\ No newline at end of file
+    # Multi-threaded WSGI server instead of Werkzeug's dev server;
+    # waitress is only needed when running the app directly
+    from waitress import serve
+
+    serve(app, host="0.0.0.0", port=5000, threads=(os.cpu_count() or 4) * 2)
@@ -0,0 +1,59 @@
+"""
+Shared pytest fixtures for the app.py test suite
+"""
+
+import ast
+import os
+import pathlib
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app_import():
+    """Import app once for the whole session, recording what ran at import time"""
+    # Import with the default (Sentry on), whatever SENTRY_ENABLED the caller has set
+    with patch.dict(os.environ), patch("sentry_sdk.init") as mock_init, \
+            patch("flask.Flask.run") as mock_run:
+        os.environ.pop("SENTRY_ENABLED", None)
+        import app  # first import triggers sentry_sdk.init
+        yield SimpleNamespace(
+            sentry_init_call=mock_init.call_args,
+            run_called=mock_run.called,
+        )
+
+
+@pytest.fixture(scope="session")
+def sentry_init_call(app_import):
+    """The call recorded for sentry_sdk.init when app was first imported"""
+    return app_import.sentry_init_call
+
+
+@pytest.fixture(scope="session")
+def app_ast():
+    """app.py parsed once into an ast.Module"""
+    source = pathlib.Path(__file__).with_name("app.py").read_text(encoding="utf-8")
+    return ast.parse(source)
+
+
+@pytest.fixture(scope="session")
+def app_meta(app_import):
+    """Snapshot of app's module attributes and registered URL rules"""
+    import app
+    return {
+        "attrs": dict(vars(app)),
+        "routes": [rule.rule for rule in app.app.url_map.iter_rules()],
+    }
+
+
+@pytest.fixture(scope="session")
+def client(app_import):
+    """Create a test client for the Flask app, shared by the whole session"""
+    from app import app as flask_app
+    testing = flask_app.config["TESTING"]
+    flask_app.config["TESTING"] = True
+    with flask_app.test_client() as client:
+        yield client
+    flask_app.config["TESTING"] = testing
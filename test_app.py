@@ -31,48 +31,26 @@ class TestFlaskAppConfiguration:
             import app as app_module
             assert app_module.app.name == 'app'
     
-    def test_sentry_init_called_with_correct_dsn(self):
+    def test_sentry_init_called_with_correct_dsn(self, sentry_init_call):
         """Test that Sentry is initialized with the correct DSN"""
-        with patch('sentry_sdk.init') as mock_sentry_init:
-            # Reimport to trigger initialization
-            import importlib
-            import app as app_module
-            importlib.reload(app_module)
-            
-            # Verify sentry_sdk.init was called
-            assert mock_sentry_init.called
-            
-            # Check DSN argument
-            call_args = mock_sentry_init.call_args
-            assert 'dsn' in call_args.kwargs or (call_args.args and len(call_args.args) > 0)
-            dsn = call_args.kwargs.get('dsn') or call_args.args[0] if call_args.args else None
-            assert dsn is not None
-            assert 'sentry.io' in dsn
+        # Verify sentry_sdk.init was called
+        assert sentry_init_call is not None
+        
+        # Check DSN argument
+        assert 'dsn' in sentry_init_call.kwargs or (sentry_init_call.args and len(sentry_init_call.args) > 0)
+        dsn = sentry_init_call.kwargs.get('dsn') or (sentry_init_call.args[0] if sentry_init_call.args else None)
+        assert dsn is not None
+        assert 'sentry.io' in dsn
     
-    def test_sentry_init_called_with_pii_enabled(self):
+    def test_sentry_init_called_with_pii_enabled(self, sentry_init_call):
         """Test that Sentry is configured to send PII data"""
-        with patch('sentry_sdk.init') as mock_sentry_init:
-            import importlib
-            import app as app_module
-            importlib.reload(app_module)
-            
-            call_args = mock_sentry_init.call_args
-            send_pii = call_args.kwargs.get('send_default_pii', False)
-            assert send_pii is True
+        send_pii = sentry_init_call.kwargs.get('send_default_pii', False)
+        assert send_pii is True
 
 
 class TestHomeEndpoint:
     """Tests for the home route (/"""
     
-    @pytest.fixture
-    def client(self):
-        """Create a test client for the Flask app"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            app_module.app.config['TESTING'] = True
-            with app_module.app.test_client() as client:
-                yield client
-    
     def test_home_returns_200_status(self, client):
         """Test that home endpoint returns 200 OK"""
         response = client.get('/')
@@ -81,7 +59,7 @@ class TestHomeEndpoint:
     def test_home_returns_expected_message(self, client):
         """Test that home endpoint returns the correct message"""
         response = client.get('/')
-        assert response.data.decode('utf-8') == "Sentry is working! Go to /bug to trigger an error 🪲"
+        assert response.data == b"Sentry is working! Go to /bug to trigger an error \xf0\x9f\xaa\xb2"
     
     def test_home_returns_text_html_content_type(self, client):
         """Test that home endpoint returns HTML content type"""
@@ -126,15 +104,6 @@ class TestHomeEndpoint:
 class TestBugEndpoint:
     """Tests for the bug route (/bug)"""
     
-    @pytest.fixture
-    def client(self):
-        """Create a test client for the Flask app"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            app_module.app.config['TESTING'] = True
-            with app_module.app.test_client() as client:
-                yield client
-    
     def test_bug_endpoint_raises_zero_division_error(self, client):
         """Test that /bug endpoint raises ZeroDivisionError"""
         with pytest.raises(ZeroDivisionError):
@@ -146,12 +115,12 @@ class TestBugEndpoint:
         # In production, Flask would return 500
         with patch('sentry_sdk.init'):
             import app as app_module
-            app_module.app.config['TESTING'] = False
-            app_module.app.config['PROPAGATE_EXCEPTIONS'] = False
+            prod_config = {'TESTING': False, 'PROPAGATE_EXCEPTIONS': False}
             
-            with app_module.app.test_client() as prod_client:
-                response = prod_client.get('/bug')
-                assert response.status_code == 500
+            with patch.dict(app_module.app.config, prod_config):
+                with app_module.app.test_client() as prod_client:
+                    response = prod_client.get('/bug')
+                    assert response.status_code == 500
     
     def test_bug_endpoint_division_by_zero_is_deliberate(self, client):
         """Test that the division by zero is the expected error type"""
@@ -164,9 +133,9 @@ class TestBugEndpoint:
     
     def test_bug_endpoint_post_method_not_allowed(self, client):
         """Test that POST method returns 405 on /bug endpoint"""
-        # Even though it will error, the route should exist
-        with pytest.raises(ZeroDivisionError):
-            client.post('/bug')
+        # /bug only accepts GET, so the view (and its error) is never reached
+        response = client.post('/bug')
+        assert response.status_code == 405
     
     def test_bug_endpoint_doesnt_return_success_message(self, client):
         """Test that the 'no bug' message is never returned due to error"""
@@ -178,79 +147,94 @@ class TestBugEndpoint:
             # Expected behavior - error occurs before return statement
             pass
     
-    def test_bug_endpoint_error_occurs_before_return(self, client):
-        """Test that error happens on line 23 before line 24 return statement"""
-        import app as app_module
-        import inspect
+    def test_bug_endpoint_error_occurs_before_return(self, app_ast):
+        """Test that trigger_bug raises ZeroDivisionError before its return statement"""
+        import ast
         
-        # Get the source code of trigger_bug function
-        source = inspect.getsource(app_module.trigger_bug)
-        lines = source.split('\n')
+        # Find the trigger_bug definition in the parsed app.py
+        trigger_bug = next(
+            node for node in app_ast.body
+            if isinstance(node, ast.FunctionDef) and node.name == 'trigger_bug'
+        )
         
-        # Verify division by zero comes before return
+        # Verify the ZeroDivisionError raise comes before return
         div_by_zero_found = False
         return_found = False
         
-        for line in lines:
-            if '1 / 0' in line or '1/0' in line:
+        for stmt in trigger_bug.body:
+            if (isinstance(stmt, ast.Raise)
+                    and isinstance(stmt.exc, ast.Call)
+                    and isinstance(stmt.exc.func, ast.Name)
+                    and stmt.exc.func.id == 'ZeroDivisionError'):
                 div_by_zero_found = True
-            if 'return' in line and div_by_zero_found:
+            if isinstance(stmt, ast.Return) and div_by_zero_found:
                 return_found = True
         
-        assert div_by_zero_found, "Division by zero statement not found"
-        assert return_found, "Return statement should exist after division"
+        assert div_by_zero_found, "ZeroDivisionError raise not found"
+        assert return_found, "Return statement should exist after the raise"
 
 
 class TestSentryIntegration:
     """Tests for Sentry SDK integration and error tracking"""
     
-    def test_sentry_captures_zero_division_error(self):
+    def test_sentry_captures_zero_division_error(self, sentry_init_call):
         """Test that Sentry captures the ZeroDivisionError from /bug endpoint"""
-        with patch('sentry_sdk.init') as mock_init:
-            with patch('sentry_sdk.capture_exception') as mock_capture:
-                import app as app_module
-                app_module.app.config['TESTING'] = False
-                app_module.app.config['PROPAGATE_EXCEPTIONS'] = False
-                
+        with patch('sentry_sdk.capture_exception') as mock_capture:
+            import app as app_module
+            prod_config = {'TESTING': False, 'PROPAGATE_EXCEPTIONS': False}
+            
+            with patch.dict(app_module.app.config, prod_config):
                 with app_module.app.test_client() as client:
                     try:
                         client.get('/bug')
                     except:
                         pass
-                
-                # Sentry should have been initialized
-                assert mock_init.called
+            
+            # Sentry should have been initialized
+            assert sentry_init_call is not None
     
-    def test_sentry_dsn_is_configured(self):
+    def test_sentry_dsn_is_configured(self, sentry_init_call):
         """Test that Sentry DSN is properly configured"""
-        with patch('sentry_sdk.init') as mock_sentry:
-            import importlib
-            import app as app_module
-            importlib.reload(app_module)
-            
-            # Verify init was called with DSN
-            assert mock_sentry.called
-            call_kwargs = mock_sentry.call_args.kwargs
-            
-            if 'dsn' in call_kwargs:
-                dsn = call_kwargs['dsn']
-                assert dsn is not None
-                assert len(dsn) > 0
-                assert 'https://' in dsn
+        # Verify init was called with DSN
+        assert sentry_init_call is not None
+        call_kwargs = sentry_init_call.kwargs
+        
+        if 'dsn' in call_kwargs:
+            dsn = call_kwargs['dsn']
+            assert dsn is not None
+            assert len(dsn) > 0
+            assert 'https://' in dsn
+
+    def test_sentry_tracing_disabled(self, sentry_init_call):
+        """Test that Sentry is initialized for errors only, without tracing"""
+        assert sentry_init_call.kwargs.get('traces_sample_rate') == 0.0
+
+    @pytest.mark.parametrize('value,enabled', [
+        (None, True),
+        ('0', False), ('false', False), ('OFF', False),
+        ('1', True), ('true', True), ('yes', True),
+    ])
+    def test_sentry_enabled_env_var(self, value, enabled):
+        """Test that only explicit off values of SENTRY_ENABLED skip Sentry initialization"""
+        import os
+        import runpy
+        import app as app_module
+        
+        # Run app.py in a throwaway namespace so the imported app module is left untouched
+        with patch.dict('os.environ'):
+            # None means unset, which should fall back to Sentry being on
+            os.environ.pop('SENTRY_ENABLED', None)
+            if value is not None:
+                os.environ['SENTRY_ENABLED'] = value
+            with patch('sentry_sdk.init') as mock_sentry:
+                runpy.run_path(app_module.__file__, run_name='app')
+        
+        assert mock_sentry.called is enabled
 
 
 class TestRouteRegistration:
     """Tests for route registration and URL patterns"""
     
-    @pytest.fixture
-    def client(self):
-        """Create a test client for the Flask app"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            app_module.app.config['TESTING'] = True
-            with app_module.app.test_client() as client:
-                yield client
-    
     def test_root_route_is_registered(self, client):
         """Test that root route (/) is registered"""
         response = client.get('/')
@@ -288,15 +272,6 @@ class TestRouteRegistration:
 class TestApplicationBehavior:
     """Tests for overall application behavior and edge cases"""
     
-    @pytest.fixture
-    def client(self):
-        """Create a test client for the Flask app"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            app_module.app.config['TESTING'] = True
-            with app_module.app.test_client() as client:
-                yield client
-    
     def test_app_handles_multiple_concurrent_home_requests(self, client):
         """Test that app can handle multiple requests to home"""
         responses = [client.get('/') for _ in range(10)]
@@ -305,8 +280,7 @@ class TestApplicationBehavior:
     def test_app_unicode_handling_in_response(self, client):
         """Test that app correctly handles unicode emoji in response"""
         response = client.get('/')
-        data = response.data.decode('utf-8')
-        assert '🪲' in data
+        assert b"\xf0\x9f\xaa\xb2" in response.data  # 🪲 in UTF-8
     
     def test_case_sensitive_routes(self, client):
         """Test that routes are case-sensitive"""
@@ -321,32 +295,20 @@ class TestApplicationBehavior:
         response = client.get('/')
         assert len(response.data) > 0
     
-    def test_app_has_correct_routes_count(self):
+    def test_app_has_correct_routes_count(self, app_meta):
         """Test that app has exactly 2 routes registered"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            
-            # Count user-defined routes (excluding static)
-            routes = [rule.rule for rule in app_module.app.url_map.iter_rules() 
-                     if not rule.rule.startswith('/static')]
-            
-            # Should have / and /bug
-            assert '/' in routes
-            assert '/bug' in routes
+        # Count user-defined routes (excluding static)
+        routes = [rule for rule in app_meta['routes']
+                  if not rule.startswith('/static')]
+        
+        # Should have / and /bug
+        assert '/' in routes
+        assert '/bug' in routes
 
 
 class TestErrorHandling:
     """Tests for error handling and exception scenarios"""
     
-    @pytest.fixture
-    def client(self):
-        """Create a test client for the Flask app"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            app_module.app.config['TESTING'] = True
-            with app_module.app.test_client() as client:
-                yield client
-    
     def test_zero_division_error_type(self, client):
         """Test that the exact error type is ZeroDivisionError"""
         with pytest.raises(ZeroDivisionError) as exc_info:
@@ -374,23 +336,17 @@ class TestErrorHandling:
 class TestImportsAndDependencies:
     """Tests for module imports and dependencies"""
     
-    def test_flask_import_successful(self):
+    def test_flask_import_successful(self, app_meta):
         """Test that Flask is successfully imported"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            assert hasattr(app_module, 'Flask')
+        assert 'Flask' in app_meta['attrs']
     
-    def test_sentry_sdk_import_successful(self):
+    def test_sentry_sdk_import_successful(self, app_meta):
         """Test that sentry_sdk is successfully imported"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            assert hasattr(app_module, 'sentry_sdk')
+        assert 'sentry_sdk' in app_meta['attrs']
     
-    def test_os_module_imported(self):
+    def test_os_module_imported(self, app_meta):
         """Test that os module is imported (even if not used)"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            assert hasattr(app_module, 'os')
+        assert 'os' in app_meta['attrs']
     
     def test_flask_integration_available(self):
         """Test that FlaskIntegration is available"""
@@ -403,32 +359,42 @@ class TestImportsAndDependencies:
 class TestMainBlock:
     """Tests for the __main__ block execution"""
     
-    def test_main_block_not_executed_on_import(self):
+    def test_main_block_not_executed_on_import(self, app_import):
         """Test that app.run() is not called when module is imported"""
-        with patch('sentry_sdk.init'):
-            with patch('flask.Flask.run') as mock_run:
-                import importlib
-                import app as app_module
-                importlib.reload(app_module)
-                
-                # run() should not be called on import
-                # (only when __name__ == "__main__")
-                # Since we're importing, __name__ will be 'app', not '__main__'
-                assert not mock_run.called or mock_run.call_count == 0
+        # run() should not be called on import
+        # (only when __name__ == "__main__")
+        # Since we're importing, __name__ will be 'app', not '__main__'
+        assert not app_import.run_called
+    
+    def test_server_only_started_under_main_guard(self, app_ast):
+        """Test that waitress.serve() is only reached inside the __main__ block"""
+        import ast
+        
+        def calls_serve(node):
+            return any(
+                isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id == 'serve'
+                for n in ast.walk(node)
+            )
+        
+        def is_main_guard(node):
+            return (isinstance(node, ast.If)
+                    and isinstance(node.test, ast.Compare)
+                    and isinstance(node.test.left, ast.Name)
+                    and node.test.left.id == '__name__'
+                    and isinstance(node.test.comparators[0], ast.Constant)
+                    and node.test.comparators[0].value == '__main__')
+        
+        main_guards = [node for node in app_ast.body if is_main_guard(node)]
+        assert len(main_guards) == 1
+        assert calls_serve(main_guards[0])
+        
+        # Nothing outside the guard starts the server
+        assert not any(calls_serve(node) for node in app_ast.body if node not in main_guards)
 
 
 class TestEndpointResponseProperties:
     """Tests for detailed response properties"""
     
-    @pytest.fixture
-    def client(self):
-        """Create a test client for the Flask app"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            app_module.app.config['TESTING'] = True
-            with app_module.app.test_client() as client:
-                yield client
-    
     def test_home_response_is_string(self, client):
         """Test that home response data is a string"""
         response = client.get('/')
@@ -443,31 +409,48 @@ class TestEndpointResponseProperties:
     def test_home_response_contains_sentry_reference(self, client):
         """Test that home response mentions Sentry"""
         response = client.get('/')
-        data = response.data.decode('utf-8')
-        assert 'Sentry' in data or 'sentry' in data.lower()
+        assert b"Sentry" in response.data or b"sentry" in response.data.lower()
     
     def test_home_response_contains_bug_route_reference(self, client):
         """Test that home response references the /bug route"""
         response = client.get('/')
-        data = response.data.decode('utf-8')
-        assert '/bug' in data
+        assert b"/bug" in response.data
+    
+    def test_home_response_content_length_matches_body(self, client):
+        """Test that home response Content-Length matches the body it sends"""
+        response = client.get('/')
+        assert response.headers['Content-Length'] == str(len(response.data))
+    
+    def test_home_response_headers_not_shared_between_requests(self, client):
+        """Test that headers added by after_request hooks don't pile up across requests"""
+        flask_app = client.application
+        
+        def add_probe_header(response):
+            response.headers.add('X-Probe', '1')
+            return response
+        
+        hooks = [*flask_app.after_request_funcs.get(None, []), add_probe_header]
+        with patch.dict(flask_app.after_request_funcs, {None: hooks}):
+            client.get('/')
+            response = client.get('/')
+        
+        assert response.headers.getlist('X-Probe') == ['1']
+    
+    def test_home_response_is_cacheable(self, client):
+        """Test that home response carries a public Cache-Control header"""
+        response = client.get('/')
+        assert 'public' in response.headers.get('Cache-Control', '')
 
 
 class TestSecurityAndConfiguration:
     """Tests for security and configuration concerns"""
     
-    def test_hardcoded_dsn_present(self):
+    def test_hardcoded_dsn_present(self, sentry_init_call):
         """Test that DSN is hardcoded (security concern for prod)"""
-        with patch('sentry_sdk.init') as mock_init:
-            import importlib
-            import app as app_module
-            importlib.reload(app_module)
-            
-            # Check that DSN is hardcoded (not from env var)
-            call_args = mock_init.call_args
-            if call_args:
-                dsn = call_args.kwargs.get('dsn') or (call_args.args[0] if call_args.args else None)
-                assert dsn is not None
+        # Check that DSN is hardcoded (not from env var)
+        if sentry_init_call:
+            dsn = sentry_init_call.kwargs.get('dsn') or (sentry_init_call.args[0] if sentry_init_call.args else None)
+            assert dsn is not None
                 # This is a security concern - DSN should ideally come from env
     
     def test_app_debug_mode_not_enabled_by_default(self):
@@ -481,49 +464,32 @@ class TestSecurityAndConfiguration:
 class TestFunctionDefinitions:
     """Tests for function definitions and signatures"""
     
-    def test_home_function_exists(self):
+    def test_home_function_exists(self, app_meta):
         """Test that home function is defined"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            assert hasattr(app_module, 'home')
-            assert callable(app_module.home)
+        assert 'home' in app_meta['attrs']
+        assert callable(app_meta['attrs']['home'])
     
-    def test_trigger_bug_function_exists(self):
+    def test_trigger_bug_function_exists(self, app_meta):
         """Test that trigger_bug function is defined"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            assert hasattr(app_module, 'trigger_bug')
-            assert callable(app_module.trigger_bug)
+        assert 'trigger_bug' in app_meta['attrs']
+        assert callable(app_meta['attrs']['trigger_bug'])
     
-    def test_home_function_takes_no_arguments(self):
+    def test_home_function_takes_no_arguments(self, app_meta):
         """Test that home function takes no arguments"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            import inspect
-            sig = inspect.signature(app_module.home)
-            assert len(sig.parameters) == 0
+        import inspect
+        sig = inspect.signature(app_meta['attrs']['home'])
+        assert len(sig.parameters) == 0
     
-    def test_trigger_bug_function_takes_no_arguments(self):
+    def test_trigger_bug_function_takes_no_arguments(self, app_meta):
         """Test that trigger_bug function takes no arguments"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            import inspect
-            sig = inspect.signature(app_module.trigger_bug)
-            assert len(sig.parameters) == 0
+        import inspect
+        sig = inspect.signature(app_meta['attrs']['trigger_bug'])
+        assert len(sig.parameters) == 0
 
 
 class TestEdgeCasesAndRobustness:
     """Tests for edge cases and application robustness"""
     
-    @pytest.fixture
-    def client(self):
-        """Create a test client for the Flask app"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            app_module.app.config['TESTING'] = True
-            with app_module.app.test_client() as client:
-                yield client
-    
     def test_query_parameters_ignored_on_home(self, client):
         """Test that query parameters don't affect home endpoint"""
         response1 = client.get('/')
@@ -568,21 +534,12 @@ class TestEdgeCasesAndRobustness:
 class TestIntegrationScenarios:
     """Integration-style tests for complete scenarios"""
     
-    @pytest.fixture
-    def client(self):
-        """Create a test client for the Flask app"""
-        with patch('sentry_sdk.init'):
-            import app as app_module
-            app_module.app.config['TESTING'] = True
-            with app_module.app.test_client() as client:
-                yield client
-    
     def test_user_journey_home_then_bug(self, client):
         """Test typical user journey: visit home, then trigger bug"""
         # Visit home
         response1 = client.get('/')
         assert response1.status_code == 200
-        assert '/bug' in response1.data.decode('utf-8')
+        assert b"/bug" in response1.data
         
         # Then visit bug
         with pytest.raises(ZeroDivisionError):